@@ -1,6 +1,7 @@
+from collections import defaultdict
 from multiprocessing import Manager, Lock, Event
 from typing import List
-from common.utils import Bet, store_bets, load_bets, has_won
+from common.utils import Bet, store_bets, store_bets_raw, load_bets, has_won
 
 
 class LotteryMonitor:
@@ -24,8 +25,8 @@ class LotteryMonitor:
 
         # Manager-backed shared objects (safe across processes)
         self._readiness_status = self._manager.dict()  # address → state
+        self._readiness_counts = self._manager.dict()  # state → number of agencies
         self._agency_id_by_address = self._manager.dict()  # address → agencyId
-        self._winners = self._manager.list()  # list of (agency, dni)
         self._winners_per_agency = self._manager.dict()  # agency → list of dni
         self._lottery_executed = self._manager.Value(
             LotteryMonitor.BOOLEAN_TYPECODE, False
@@ -37,9 +38,21 @@ class LotteryMonitor:
     def set_readiness(self, address: str, state: int):
         """
         Set the readiness state for a given client address (ip:port).
+
+        Keeps a per-state counter up to date so readiness checks do not
+        need to scan every agency entry.
         """
         with self._lock:
+            old_state = self._readiness_status.get(address, None)
+            if old_state == state:
+                return
+
             self._readiness_status[address] = state
+            if old_state is not None:
+                self._readiness_counts[old_state] = (
+                    self._readiness_counts.get(old_state, 0) - 1
+                )
+            self._readiness_counts[state] = self._readiness_counts.get(state, 0) + 1
 
     def get_readiness(self, address: str) -> int:
         """
@@ -64,12 +77,9 @@ class LotteryMonitor:
             if len(self._readiness_status) < max_agencies:
                 return False
 
-            # Ensure no agency is still sending bets
-            for status in self._readiness_status.values():
-                if status == sending_bets_state:
-                    return False
-
-            return True
+            # Ensure no agency is still sending bets (O(1) counter check
+            # maintained by set_readiness instead of a full scan)
+            return self._readiness_counts.get(sending_bets_state, 0) == 0
 
     def set_agency_id(self, address: str, agency_id: int):
         """
@@ -101,23 +111,16 @@ class LotteryMonitor:
             # Mark as executed first to prevent race conditions
             self._lottery_executed.value = True
 
-            # Load bets and compute winners
-            bets: List[Bet] = load_bets()
-            for bet in bets:
+            # Stream bets and group winners by agency in a single pass,
+            # building a local dict so the Manager proxy is updated once
+            winners_per_agency = defaultdict(list)
+            for bet in load_bets():
                 if has_won(bet):
-                    agency = int(bet.agency)
-                    dni = int(bet.document)
-
-                    # Add to winners list
-                    self._winners.append((agency, dni))
+                    # Bet.__init__ already stores agency as int; only the
+                    # document field needs parsing here
+                    winners_per_agency[bet.agency].append(int(bet.document))
 
-                    # Group by agency
-                    if agency not in self._winners_per_agency.keys():
-                        self._winners_per_agency[agency] = []
-
-                    self._winners_per_agency[agency] = self._winners_per_agency[
-                        agency
-                    ] + [dni]
+            self._winners_per_agency.update(winners_per_agency)
 
         # Set the event to wake up all waiting processes (outside the lock)
         self._lottery_complete_event.set()
@@ -163,6 +166,19 @@ class LotteryMonitor:
             except Exception:
                 return False
 
+    def store_bets_raw(self, payload: str) -> bool:
+        """
+        Store preformatted CSV bet rows in a process-safe manner.
+
+        Args:
+            payload: Newline-terminated CSV rows in storage layout.
+
+        Returns:
+            bool: True if storing succeeded, False otherwise.
+        """
+        with self._lock:
+            return store_bets_raw(payload) >= 0
+
     def shutdown(self):
         self._lottery_complete_event.set()
         self._manager.shutdown()
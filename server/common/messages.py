@@ -1,3 +1,5 @@
+import struct
+
 from common.utils import Bet
 from datetime import date
 from typing import Literal, List
@@ -22,6 +24,21 @@ FAILURE_UNKNOWN_MESSAGE = 1
 FAILURE_COULD_NOT_PROCESS_BET = 2
 
 
+def _escape_csv_field(value: str) -> str:
+    """
+    Quote a free-text CSV field the way csv.QUOTE_MINIMAL would.
+
+    Names and surnames arrive as arbitrary UTF-8 off the wire; a
+    separator, quote or newline inside them must not shift columns in
+    the storage file that csv.reader later parses.
+    """
+    if '"' in value:
+        return '"' + value.replace('"', '""') + '"'
+    if "," in value or "\n" in value or "\r" in value:
+        return '"' + value + '"'
+    return value
+
+
 class Message:
     """
     Abstract base class for all protocol messages.
@@ -37,6 +54,9 @@ class Message:
         Byte order for integer encoding.
     """
 
+    # Message type identifier, overridden by each concrete message
+    KIND = None
+
     def to_bytes(
         self, character_encoding: str, endianness: Literal["big", "little"]
     ) -> bytes:
@@ -74,6 +94,11 @@ class StandardBet:
         Bet number.
     """
 
+    # Slot layout instead of a per-instance __dict__: thousands of
+    # StandardBet objects are alive per batch, so this shrinks each one
+    # and speeds attribute access in the decode/store hot paths
+    __slots__ = ("_agency", "_name", "_surname", "_dni", "_birthdate", "_number")
+
     def __init__(
         self,
         agency: int,
@@ -143,6 +168,27 @@ class StandardBet:
 
         return header + payload
 
+    def to_csv_row(self) -> str:
+        """
+        Format this bet as a CSV storage row.
+
+        Produces the same column layout as `store_bets` writing a
+        domain `Bet`, without constructing the intermediate object.
+
+        Returns
+        -------
+        str
+            The bet fields joined by commas (no trailing newline).
+        """
+        birthdate_str: str = date.fromtimestamp(self._birthdate).isoformat()
+        name: str = _escape_csv_field(self._name)
+        surname: str = _escape_csv_field(self._surname)
+
+        return (
+            f"{self._agency},{name},{surname},"
+            f"{self._dni},{birthdate_str},{self._number}"
+        )
+
     def to_utility_bet(self) -> Bet:
         """
         Convert this protocol-level bet into a domain `Bet` object.
@@ -175,6 +221,8 @@ class MsgRegisterBets(Message):
             [4 bytes bet_length][bet_bytes]
     """
 
+    KIND = MSG_TYPE_REGISTER_BETS
+
     def __init__(self, bets: List[StandardBet]):
         self._msg_type = MSG_TYPE_REGISTER_BETS
         self._number_of_bets = len(bets)
@@ -219,6 +267,8 @@ class MsgRegisterBetOk(Message):
         [2 bytes msg_type]
     """
 
+    KIND = MSG_TYPE_REGISTER_BET_OK
+
     def __init__(self):
         self._msg_type = MSG_TYPE_REGISTER_BET_OK
 
@@ -246,6 +296,8 @@ class MsgAck(Message):
         [2 bytes msg_type]
     """
 
+    KIND = MSG_TYPE_ACK
+
     def __init__(self):
         self._msg_type = MSG_TYPE_ACK
 
@@ -280,6 +332,8 @@ class MsgRegisterBetFailed(Message):
         Error code indicating reason for failure.
     """
 
+    KIND = MSG_TYPE_REGISTER_BET_FAILED
+
     def __init__(self, error_code: int):
         self._msg_type = MSG_TYPE_REGISTER_BET_FAILED
         self._error_code = error_code
@@ -319,6 +373,8 @@ class MsgAllBetsSent(Message):
         [2 bytes msg_type]
     """
 
+    KIND = MSG_TYPE_ALL_BETS_SENT
+
     def __init__(self):
         self._msg_type = MSG_TYPE_ALL_BETS_SENT
 
@@ -346,6 +402,8 @@ class MsgRequestWinners(Message):
         [2 bytes msg_type]
     """
 
+    KIND = MSG_TYPE_REQUEST_WINNERS
+
     def __init__(self):
         self._msg_type = MSG_TYPE_REQUEST_WINNERS
 
@@ -365,9 +423,6 @@ class MsgRequestWinners(Message):
         return f"MsgRequestWinners()"
 
 
-from typing import List, Literal
-
-
 class MsgInformWinners(Message):
     """
     Server → Client message: inform winners.
@@ -380,6 +435,8 @@ class MsgInformWinners(Message):
         ...
     """
 
+    KIND = MSG_TYPE_INFORM_WINNERS
+
     def __init__(self, dni_winners: List[int]):
         self._msg_type = MSG_TYPE_INFORM_WINNERS
         self._dni_winners: List[int] = dni_winners
@@ -389,20 +446,18 @@ class MsgInformWinners(Message):
     ) -> bytes:
         """
         Serialize the message into binary format.
-        """
-        payload: bytes = b""
-
-        # Write msg_type (2 bytes)
-        payload += self._msg_type.to_bytes(SIZEOF_UINT16, endianness)
 
-        # Write number_of_dni_winners (8 bytes)
-        payload += len(self._dni_winners).to_bytes(SIZEOF_UINT64, endianness)
-
-        # Write each dni_winner (4 bytes each)
-        for dni in self._dni_winners:
-            payload += int(dni).to_bytes(SIZEOF_UINT32, endianness)
-
-        return payload
+        The whole message (msg_type, number_of_dni_winners and every
+        4-byte dni) is packed with a single struct.pack call so no
+        intermediate buffers are built per winner.
+        """
+        prefix: str = ">" if endianness == "big" else "<"
+        return struct.pack(
+            f"{prefix}HQ{len(self._dni_winners)}I",
+            self._msg_type,
+            len(self._dni_winners),
+            *self._dni_winners,
+        )
 
     def __str__(self) -> str:
         return f"MsgInformWinners(dni_winners={self._dni_winners})"
@@ -1,10 +1,11 @@
+import threading
+
 from logging import Logger
 from common.protocol import Protocol
 from common.socket import Socket
 from typing import Tuple, List
-from common.utils import Bet
 from common.lottery_monitor import LotteryMonitor
-from multiprocessing import Process, Event, Manager
+from multiprocessing import Process, Event
 
 from common.messages import (
     Message,
@@ -47,38 +48,52 @@ class Server:
 
     SIGNAL_STOPPING = 107
 
+    # Number of buffered bets that triggers a flush to persistent storage
+    FLUSH_THRESHOLD = 2048
+
     def __init__(
         self, port: int, listen_backlog: int, number_of_agencies: int, logger: Logger
     ):
         self._protocol = Protocol(port, listen_backlog, logger)
         self._max_agencies: int = number_of_agencies
         self._logger: Logger = logger
-        self._running: bool = False
-        self._stopped: bool = False
+
+        # Single stop flag for the accept loop: set once by stop(), checked
+        # per iteration (C-level Event instead of a pair of booleans)
+        self._stop_event = threading.Event()
 
         # Shared monitor for readiness, agency mapping, and winners
         self._lottery_monitor: LotteryMonitor = LotteryMonitor()
 
+        # CSV rows buffered by this process awaiting a flush, so several
+        # client batches share a single storage write
+        self._pending_rows: List[str] = []
+
         # Track child processes
         self._processes: List[Process] = []
 
         # Shared shutdown event (proxy object)
         self._shutdown_event = Event()
 
-        # Track child processes
-        self._processes = []
+        # Message dispatch table: one dict lookup on msg.KIND instead of
+        # an isinstance chain per received message
+        self._message_handlers = {
+            MsgRegisterBets.KIND: self.__handle_register_bets,
+            MsgAck.KIND: self.__handle_ack,
+            MsgAllBetsSent.KIND: self.__handle_all_bets_sent,
+            MsgRequestWinners.KIND: self.__handle_request_winners,
+        }
 
     def run(self) -> None:
         """
         Main loop: accept new connections and spawn a process for each client.
         """
-        self._running = True
         self._logger.info("action: starting_loop | result: success")
 
-        if self._stopped:
+        if self._stop_event.is_set():
             return
 
-        while self._running:
+        while not self._stop_event.is_set():
             try:
                 addr, client_socket = self._protocol.accept_new_connection()
                 if client_socket:
@@ -92,16 +107,20 @@ class Server:
                         ),
                     )
                     p.start()
+
+                    # Reap finished handlers so the list (and the final join
+                    # scan in stop()) does not grow with every client lifetime
+                    self._processes = [p_ for p_ in self._processes if p_.is_alive()]
                     self._processes.append(p)
             except OSError as e:
-                if self._running:
+                if not self._stop_event.is_set():
                     self._logger.error(
                         f"action: accept_connection | result: fail | error: {e}"
                     )
                 break
 
         # Cleanup
-        if not self._stopped:
+        if not self._stop_event.is_set():
             self._protocol.shutdown()
             for p in self._processes:
                 p.join()
@@ -116,7 +135,9 @@ class Server:
         Run in a separate process: handle all communication with a single client.
         """
         self._logger.info(
-            f"action: client_handler_started | result: success | client: {addr[0]}:{addr[1]}"
+            "action: client_handler_started | result: success | client: %s:%s",
+            addr[0],
+            addr[1],
         )
 
         try:
@@ -128,8 +149,13 @@ class Server:
 
                 try:
                     msg = client_sock.receive_message()
-                    self._logger.info(
-                        f"action: receive_message | result: success | msg: {msg} | client: {addr[0]}:{addr[1]}"
+                    # Per-message trace: lazy formatting and DEBUG level so
+                    # the hot path does not build the string in production
+                    self._logger.debug(
+                        "action: receive_message | result: success | msg: %s | client: %s:%s",
+                        msg,
+                        addr[0],
+                        addr[1],
                     )
 
                     keep_handling_client = self.__send_message_response(
@@ -143,7 +169,8 @@ class Server:
 
                         if current_state == Server.AGENCY_WAITING_FOR_LOTTERY:
                             self._logger.info(
-                                f"action: waiting_for_lottery | result: in_progress | client: {agencyAddress}"
+                                "action: waiting_for_lottery | result: in_progress | client: %s",
+                                agencyAddress,
                             )
 
                             if lottery_monitor.wait_for_lottery_completion():
@@ -168,71 +195,107 @@ class Server:
                         )
                     break
         finally:
+            # Best-effort flush of bets buffered by this handler so an
+            # abrupt disconnect does not lose already-acknowledged batches
+            if not self.__flush_pending_bets(lottery_monitor):
+                self._logger.error(
+                    "action: flush_pending_bets | result: fail | client: %s:%s",
+                    addr[0],
+                    addr[1],
+                )
             self._protocol.shutdown_socket(client_sock)
             self._logger.info(
-                f"action: client_handler_stopped | result: success | client: {addr[0]}:{addr[1]}"
+                "action: client_handler_stopped | result: success | client: %s:%s",
+                addr[0],
+                addr[1],
             )
 
     def __send_message_response(
         self, client_sock: Socket, msg: Message, lottery_monitor: LotteryMonitor
     ) -> int:
         """
-        Dispatch message and send response.
+        Dispatch message by its KIND and send response.
         """
-        if isinstance(msg, MsgRegisterBets):
-            agencyAddress: str = client_sock.get_remote_address()
-            agencyId = msg.get_bets()[0]._agency
-
-            lottery_monitor.set_readiness(agencyAddress, Server.AGENCY_SENDING_BETS)
-            lottery_monitor.set_agency_id(agencyAddress, agencyId)
-            self.__process_batch_bet_registration(client_sock, msg, lottery_monitor)
-            return Server.CONTINUE
-
-        elif isinstance(msg, MsgAck):
-            if lottery_monitor.has_lottery_occurred():
-                return Server.CONTINUE_SAFE_TO_END
-            return Server.CONTINUE
+        handler = self._message_handlers.get(msg.KIND)
+        if handler is None:
+            return self.__handle_unknown_message(client_sock, msg, lottery_monitor)
+        return handler(client_sock, msg, lottery_monitor)
 
-        elif isinstance(msg, MsgAllBetsSent):
-            agencyAddress: str = client_sock.get_remote_address()
-            lottery_monitor.set_readiness(
-                agencyAddress, Server.AGENCY_READY_FOR_LOTTERY
-            )
+    def __handle_register_bets(
+        self, client_sock: Socket, msg: MsgRegisterBets, lottery_monitor: LotteryMonitor
+    ) -> int:
+        agencyAddress: str = client_sock.get_remote_address()
+        agencyId = msg.get_bets()[0]._agency
 
-            if self.__all_agencies_ready(lottery_monitor):
-                # Try to execute lottery (only first process will succeed)
-                lottery_executed = self.__do_lottery(lottery_monitor)
-                if lottery_executed:
-                    # This process executed the lottery, send winners immediately
-                    self.__send_winners_to_client(client_sock, lottery_monitor)
-                    return Server.CONTINUE_SAFE_TO_END
+        lottery_monitor.set_readiness(agencyAddress, Server.AGENCY_SENDING_BETS)
+        lottery_monitor.set_agency_id(agencyAddress, agencyId)
+        self.__process_batch_bet_registration(client_sock, msg, lottery_monitor)
+        return Server.CONTINUE
 
+    def __handle_ack(
+        self, client_sock: Socket, msg: MsgAck, lottery_monitor: LotteryMonitor
+    ) -> int:
+        if lottery_monitor.has_lottery_occurred():
             return Server.CONTINUE_SAFE_TO_END
+        return Server.CONTINUE
 
-        elif isinstance(msg, MsgRequestWinners):
-            agencyAddress: str = client_sock.get_remote_address()
-            lottery_monitor.set_readiness(
-                agencyAddress, Server.AGENCY_WAITING_FOR_LOTTERY
+    def __handle_all_bets_sent(
+        self, client_sock: Socket, msg: MsgAllBetsSent, lottery_monitor: LotteryMonitor
+    ) -> int:
+        # Persist any buffered bets before declaring this agency ready,
+        # so the lottery sees every bet it sent. If the flush fails the
+        # agency must not be marked ready: the lottery would silently run
+        # on incomplete data
+        if not self.__flush_pending_bets(lottery_monitor):
+            self._protocol.send_register_bets_failed(
+                client_sock, FAILURE_COULD_NOT_PROCESS_BET
+            )
+            self._logger.error(
+                "action: flush_pending_bets | result: fail | client: %s",
+                client_sock.get_remote_address(),
             )
+            return Server.STOP
 
-            if lottery_monitor.has_lottery_occurred():
-                # Lottery already completed, send winners immediately
+        agencyAddress: str = client_sock.get_remote_address()
+        lottery_monitor.set_readiness(agencyAddress, Server.AGENCY_READY_FOR_LOTTERY)
+
+        if self.__all_agencies_ready(lottery_monitor):
+            # Try to execute lottery (only first process will succeed)
+            lottery_executed = self.__do_lottery(lottery_monitor)
+            if lottery_executed:
+                # This process executed the lottery, send winners immediately
                 self.__send_winners_to_client(client_sock, lottery_monitor)
                 return Server.CONTINUE_SAFE_TO_END
-            else:
-                # Lottery not complete yet, will wait in main loop
-                agency = lottery_monitor.get_agency_id(agencyAddress)
-                self._logger.info(
-                    f"action: agency_{agency}_waiting | result: in_progress"
-                )
-                return Server.CONTINUE
 
+        return Server.CONTINUE_SAFE_TO_END
+
+    def __handle_request_winners(
+        self,
+        client_sock: Socket,
+        msg: MsgRequestWinners,
+        lottery_monitor: LotteryMonitor,
+    ) -> int:
+        agencyAddress: str = client_sock.get_remote_address()
+        lottery_monitor.set_readiness(agencyAddress, Server.AGENCY_WAITING_FOR_LOTTERY)
+
+        if lottery_monitor.has_lottery_occurred():
+            # Lottery already completed, send winners immediately
+            self.__send_winners_to_client(client_sock, lottery_monitor)
+            return Server.CONTINUE_SAFE_TO_END
         else:
-            self._protocol.send_register_bets_failed(
-                client_sock, FAILURE_UNKNOWN_MESSAGE
+            # Lottery not complete yet, will wait in main loop
+            agency = lottery_monitor.get_agency_id(agencyAddress)
+            self._logger.info(
+                "action: agency_%s_waiting | result: in_progress", agency
             )
-            self._logger.error("action: mensaje_desconocido | result: fail")
-            return Server.STOP
+            return Server.CONTINUE
+
+    def __handle_unknown_message(
+        self, client_sock: Socket, msg: Message, lottery_monitor: LotteryMonitor
+    ) -> int:
+        self._protocol.send_register_bets_failed(client_sock, FAILURE_UNKNOWN_MESSAGE)
+        self._logger.error("action: mensaje_desconocido | result: fail")
+        return Server.STOP
 
     def __send_winners_to_client(
         self, client_sock: Socket, lottery_monitor: LotteryMonitor
@@ -247,10 +310,10 @@ class Server:
         if current_state == Server.AGENCY_WAITING_FOR_LOTTERY:
             agencyId = lottery_monitor.get_agency_id(agencyAddress)
 
-            if agencyId:
+            if agencyId is not None:
                 dni_winners = lottery_monitor.get_winners_for_agency(agencyId)
                 self._logger.info(
-                    f"action: inform_winners | result: success | client: {agencyId}"
+                    "action: inform_winners | result: success | client: %s", agencyId
                 )
                 self._protocol.inform_winners(client_sock, dni_winners)
 
@@ -290,26 +353,48 @@ class Server:
         if storing_success:
             self._protocol.send_register_bets_ok(client_sock)
             self._logger.info(
-                f"action: apuesta_recibida | result: success | cantidad: {len(standard_bets)}"
+                "action: apuesta_recibida | result: success | cantidad: %d",
+                len(standard_bets),
             )
             return
         self._protocol.send_register_bets_failed(
             client_sock, FAILURE_COULD_NOT_PROCESS_BET
         )
         self._logger.info(
-            f"action: apuesta_recibida | result: fail | cantidad: {len(standard_bets)}"
+            "action: apuesta_recibida | result: fail | cantidad: %d",
+            len(standard_bets),
         )
 
     def __store_bets(
         self, standard_bets: List[StandardBet], lottery_monitor: LotteryMonitor
     ) -> bool:
-        bets: List[Bet] = [bet.to_utility_bet() for bet in standard_bets]
-        return lottery_monitor.store_bets(bets)
+        """
+        Buffer the batch as preformatted CSV rows and flush to storage
+        once FLUSH_THRESHOLD bets accumulate, amortizing the storage
+        write over several batches.
+        """
+        self._pending_rows.extend([bet.to_csv_row() for bet in standard_bets])
+        if len(self._pending_rows) >= Server.FLUSH_THRESHOLD:
+            return self.__flush_pending_bets(lottery_monitor)
+        return True
+
+    def __flush_pending_bets(self, lottery_monitor: LotteryMonitor) -> bool:
+        """
+        Write all buffered bet rows to persistent storage in a single call.
+        """
+        if not self._pending_rows:
+            return True
+        payload: str = "\n".join(self._pending_rows) + "\n"
+        storing_success: bool = lottery_monitor.store_bets_raw(payload)
+        if storing_success:
+            # Keep the rows on failure so a later flush can retry them
+            self._pending_rows = []
+        return storing_success
 
     def stop(self) -> None:
-        self._running = False
-        if self._stopped:
+        if self._stop_event.is_set():
             return
+        self._stop_event.set()
 
         # Signal all child processes to shutdown gracefully
         self._shutdown_event.set()
@@ -319,7 +404,5 @@ class Server:
         self._lottery_monitor.shutdown()
 
         # Give processes time to shutdown gracefully
-        for i, p in enumerate(self._processes):
+        for p in self._processes:
             p.join()
-
-        self._stopped = True
@@ -24,7 +24,7 @@ class SignalHandler:
         Logs the signal and requests the server to stop.
         """
         self._logger.info(
-            f"action: signal_with_code_{signum}_received | result: success"
+            "action: signal_with_code_%d_received | result: success", signum
         )
         self._server.stop()
         self._logger.info("action: server_shutdown | result: success")
@@ -1,4 +1,6 @@
+import codecs
 import socket
+import struct
 from socket import socket as StdSocket
 from typing import Tuple, List
 from common.messages import (
@@ -18,6 +20,27 @@ from common.messages import (
     SIZEOF_INT64,
 )
 
+# Precompiled unpackers (network byte order) for the fixed-width regions
+# of a bet payload, so each region is decoded with one C-level call
+BET_HEAD_STRUCT = struct.Struct(">II")  # agency, name_length
+STRING_LENGTH_STRUCT = struct.Struct(">I")  # surname_length
+BET_TAIL_STRUCT = struct.Struct(">IqI")  # dni, birthdate, number
+BATCH_COUNT_STRUCT = struct.Struct(">I")  # number_of_bets
+BET_LENGTH_STRUCT = struct.Struct(">Q")  # per-bet length prefix
+MSG_TYPE_STRUCT = struct.Struct(">H")  # message header (msg_type)
+
+# Direct C entry point of the UTF-8 codec, skipping the bytes.decode
+# method dispatch and codec registry lookup on every string field
+_utf8_decode = codecs.utf_8_decode
+
+# Size of the message header (msg_type), folded once at import time
+MESSAGE_HEADER_SIZE = SIZEOF_UINT16
+
+# Upper bound accepted for a single bet payload: a real bet is well under
+# 100 bytes, so anything near this limit is a corrupt or hostile length
+# prefix and must not drive buffer growth
+MAX_BET_PAYLOAD_SIZE = 64 * 1024
+
 
 class Socket:
     """
@@ -39,6 +62,14 @@ class Socket:
     NETWORK_ENDIANNESS = "big"
     CHAR_ENCODING = "utf-8"
 
+    # Kernel buffer size for accepted sockets, sized to hold a full
+    # bet batch so the payload can be consumed with few recv() calls
+    SOCKET_BUFFER_SIZE = 64 * 1024
+
+    # Amount of bytes requested from the kernel per recv() when refilling
+    # the userspace read-ahead buffer
+    READ_AHEAD_SIZE = 8 * 1024
+
     def __init__(self, port: int, listen_backlog: int):
         """
         Create a listening TCP socket bound to the given port.
@@ -51,8 +82,27 @@ class Socket:
             Maximum number of queued connections.
         """
         self._socket: StdSocket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+        # Allow several server instances to bind the same port and let the
+        # kernel load-balance accepts across their queues (Linux 3.9+)
+        if hasattr(socket, "SO_REUSEPORT"):
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+        # Size the listener's kernel buffers before listen(): accepted
+        # sockets inherit them, and the receive window offered during the
+        # handshake is derived from the buffer size at accept time
+        self._socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, Socket.SOCKET_BUFFER_SIZE
+        )
+        self._socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, Socket.SOCKET_BUFFER_SIZE
+        )
+
         self._socket.bind(("", port))
         self._socket.listen(listen_backlog)
+        self._receive_buffer: bytearray = bytearray()
+        self._chunk_buffer: bytearray = bytearray(Socket.READ_AHEAD_SIZE)
+        self._remote_address: str = None
 
     @classmethod
     def __from_existing(cls, sock: StdSocket) -> "Socket":
@@ -73,6 +123,9 @@ class Socket:
         """
         obj: Socket = cls.__new__(cls)  # bypass __init__
         obj._socket = sock
+        obj._receive_buffer = bytearray()
+        obj._chunk_buffer = bytearray(Socket.READ_AHEAD_SIZE)
+        obj._remote_address = None
         return obj
 
     def shutdown(self):
@@ -83,9 +136,15 @@ class Socket:
         """
         try:
             self._socket.shutdown(socket.SHUT_RDWR)
-            self._socket.close()
         except (OSError, IOError):
             pass
+        finally:
+            # Always release the descriptor: shutdown raises ENOTCONN on
+            # an already-disconnected peer, which must not leak the fd
+            try:
+                self._socket.close()
+            except (OSError, IOError):
+                pass
 
     def accept(self) -> Tuple[Tuple[str, int], "Socket"]:
         """
@@ -98,9 +157,36 @@ class Socket:
               - client address (IP, port)
               - a wrapped `Socket` instance for the client connection.
         """
+        # CPython's accept() already uses accept4 under the hood, so the
+        # only per-connection setup left to batch is the option tuning
         client_socket, addr = self._socket.accept()
+        Socket.__configure_client_socket(client_socket)
         return addr, Socket.__from_existing(client_socket)
 
+    @staticmethod
+    def __configure_client_socket(client_socket: StdSocket) -> None:
+        """
+        Apply the per-connection socket options to a freshly accepted
+        client socket.
+        """
+        # Size the kernel buffers to fit a whole bet batch, reducing the
+        # number of recv()/send() syscalls needed per batch
+        client_socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_RCVBUF, Socket.SOCKET_BUFFER_SIZE
+        )
+        client_socket.setsockopt(
+            socket.SOL_SOCKET, socket.SO_SNDBUF, Socket.SOCKET_BUFFER_SIZE
+        )
+
+        # Disable Nagle's algorithm: the protocol is a request/response
+        # ping-pong of small control messages, so replies must not sit in
+        # the kernel waiting to be coalesced
+        client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        # Ack incoming batches immediately instead of delaying (Linux only)
+        if hasattr(socket, "TCP_QUICKACK"):
+            client_socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_QUICKACK, 1)
+
     def send_message(self, msg: Message) -> None:
         """
         Send a protocol message to the connected peer.
@@ -134,8 +220,10 @@ class Socket:
         """
         Read exactly `n_bytes` from the socket.
 
-        Keeps calling `recv()` until the requested number of bytes
-        is read, or raises an error if the client disconnects.
+        Reads are served from a userspace read-ahead buffer which is
+        refilled through `recv_into` on a preallocated per-connection
+        chunk buffer, so several framed reads (header + payload fields)
+        are satisfied with a single syscall and no per-recv allocation.
 
         Parameters
         ----------
@@ -152,78 +240,52 @@ class Socket:
         ConnectionError
             If the client disconnects before all bytes are read.
         """
-        data: bytes = b""
-        while len(data) < n_bytes:
-            chunk = self._socket.recv(n_bytes - len(data))
-            if not chunk:
+        buffer: bytearray = self._receive_buffer
+
+        # Bind the bound method once: both refill loops below may call it
+        # many times per payload
+        recv_into = self._socket.recv_into
+
+        # Large read with nothing buffered: fill the reusable chunk buffer
+        # directly through recv_into, skipping the read-ahead copy. The
+        # buffer grows by doubling to the largest payload seen and is then
+        # reused, so steady-state large reads allocate nothing but the
+        # final bytes copy.
+        if not buffer and n_bytes >= Socket.READ_AHEAD_SIZE:
+            if n_bytes > len(self._chunk_buffer):
+                grown_size: int = len(self._chunk_buffer)
+                while grown_size < n_bytes:
+                    grown_size *= 2
+                self._chunk_buffer = bytearray(grown_size)
+
+            # MSG_WAITALL asks the kernel to block until the full request
+            # is available, typically satisfying the payload in a single
+            # syscall; the loop still covers short returns (EINTR, EOF)
+            view = memoryview(self._chunk_buffer)
+            received_total: int = 0
+            while received_total < n_bytes:
+                received = recv_into(
+                    view[received_total:n_bytes], 0, socket.MSG_WAITALL
+                )
+                if received == 0:
+                    raise ConnectionError(
+                        "Client disconnected during byte reading from socket"
+                    )
+                received_total += received
+            return bytes(view[:n_bytes])
+
+        chunk_view = memoryview(self._chunk_buffer)
+        while len(buffer) < n_bytes:
+            received: int = recv_into(self._chunk_buffer)
+            if received == 0:
                 raise ConnectionError(
                     "Client disconnected during byte reading from socket"
                 )
-            data += chunk
-        return data
-
-    def __decode_a_bet(self, payload: bytes) -> StandardBet:
-        """
-        Decode a `StandardBet` from its payload.
-
-        Payload format:
-            [4 bytes agency]
-            [4 bytes name_length][name_bytes]
-            [4 bytes surname_length][surname_bytes]
-            [4 bytes dni]
-            [8 bytes birthdate_unix_timestamp]
-            [4 bytes number]
-
-        Returns
-        -------
-        StandardBet
-            A decoded bet object.
-        """
-        offset: int = 0
+            buffer.extend(chunk_view[:received])
 
-        # Agency
-        agency: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
-        offset += SIZEOF_UINT32
-
-        # Name
-        name_len: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
-        offset += SIZEOF_UINT32
-        name: str = payload[offset : offset + name_len].decode("utf-8")
-        offset += name_len
-
-        # Surname
-        surname_len: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
-        offset += SIZEOF_UINT32
-        surname: str = payload[offset : offset + surname_len].decode("utf-8")
-        offset += surname_len
-
-        # Dni
-        dni: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
-        offset += SIZEOF_UINT32
-
-        # Birthdate
-        birthdate: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_INT64],
-            Socket.NETWORK_ENDIANNESS,
-            signed=True,
-        )
-        offset += SIZEOF_INT64
-
-        # Number
-        number: int = int.from_bytes(
-            payload[offset : offset + SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
-        offset += SIZEOF_UINT32
-
-        return StandardBet(agency, name, surname, dni, birthdate, number)
+        data: bytes = bytes(memoryview(buffer)[:n_bytes])
+        del buffer[:n_bytes]
+        return data
 
     def __decode_bets(self) -> List[StandardBet]:
         """
@@ -234,33 +296,85 @@ class Socket:
             For each bet:
                 [8 bytes bet_length]
                 [bet_bytes]
+
+        Each bet payload is decoded inline (the per-bet helper is fused
+        into the loop so no function frame is set up per bet):
+            [4 bytes agency]
+            [4 bytes name_length][name_bytes]
+            [4 bytes surname_length][surname_bytes]
+            [4 bytes dni]
+            [8 bytes birthdate_unix_timestamp]
+            [4 bytes number]
         """
 
         # Read number_of_bets (4 bytes)
-        raw_number_of_bets: bytes = self.__receive_all(SIZEOF_UINT32)
-        number_of_bets: int = int.from_bytes(
-            raw_number_of_bets[0:SIZEOF_UINT32], Socket.NETWORK_ENDIANNESS
-        )
+        (number_of_bets,) = BATCH_COUNT_STRUCT.unpack(self.__receive_all(SIZEOF_UINT32))
 
         bets: List[StandardBet] = []
 
+        # Hoist the loop-invariant bound methods, unpackers and sizes to
+        # locals: each would otherwise be re-resolved on every bet
+        receive_all = self.__receive_all
+        unpack_length = BET_LENGTH_STRUCT.unpack
+        unpack_head = BET_HEAD_STRUCT.unpack_from
+        unpack_string_length = STRING_LENGTH_STRUCT.unpack_from
+        unpack_tail = BET_TAIL_STRUCT.unpack_from
+        utf8_decode = _utf8_decode
+        append_bet = bets.append
+        head_size: int = BET_HEAD_STRUCT.size
+        string_length_size: int = STRING_LENGTH_STRUCT.size
+
         # Decode each bet in the batch
         for _ in range(number_of_bets):
             # Each bet is prefixed with its length (8 bytes)
-            raw_length: bytes = self.__receive_all(SIZEOF_UINT64)
-            length: int = int.from_bytes(
-                raw_length[0:SIZEOF_UINT64], Socket.NETWORK_ENDIANNESS
-            )
+            (length,) = unpack_length(receive_all(SIZEOF_UINT64))
+            if length > MAX_BET_PAYLOAD_SIZE:
+                raise ValueError(f"Bet payload length {length} exceeds protocol limit")
 
             # Read the bet payload
-            payload: bytes = self.__receive_all(length)
+            payload: bytes = receive_all(length)
+
+            # Zero-copy window over the payload: string fields decode
+            # straight from memoryview slices
+            view = memoryview(payload)
+
+            # Agency + name length (one unpack for the fixed prefix)
+            agency, name_len = unpack_head(payload, 0)
+            offset: int = head_size
+
+            # Name
+            name, _ = utf8_decode(view[offset : offset + name_len])
+            offset += name_len
 
-            # Decode into a StandardBet object
-            bet: StandardBet = self.__decode_a_bet(payload)
-            bets.append(bet)
+            # Surname
+            (surname_len,) = unpack_string_length(payload, offset)
+            offset += string_length_size
+            surname, _ = utf8_decode(view[offset : offset + surname_len])
+            offset += surname_len
+
+            # Dni + birthdate + number (one unpack for the fixed suffix)
+            dni, birthdate, number = unpack_tail(payload, offset)
+
+            append_bet(StandardBet(agency, name, surname, dni, birthdate, number))
 
         return bets
 
+    def __decode_register_bets(self) -> Message:
+        """
+        Decode a `MsgRegisterBets` message body from the socket.
+        """
+        return MsgRegisterBets(self.__decode_bets())
+
+    # Dispatch table from msg_type to decoder, consulted with a single
+    # dict lookup instead of walking an if/elif chain. Payload-less
+    # control messages decode straight into their constructor.
+    _MESSAGE_DECODERS = {
+        MSG_TYPE_REGISTER_BETS: __decode_register_bets,
+        MSG_TYPE_ACK: lambda self: MsgAck(),
+        MSG_TYPE_ALL_BETS_SENT: lambda self: MsgAllBetsSent(),
+        MSG_TYPE_REQUEST_WINNERS: lambda self: MsgRequestWinners(),
+    }
+
     def __decode_message(self) -> Message:
         """
         Decode a single message from the socket.
@@ -282,26 +396,13 @@ class Socket:
         """
 
         # First, read the message type (2 bytes)
-        sizeof_header: int = SIZEOF_UINT16
-        header: bytes = self.__receive_all(sizeof_header)
-
-        msg_type: int = int.from_bytes(
-            header[0:SIZEOF_UINT16], Socket.NETWORK_ENDIANNESS
-        )
+        (msg_type,) = MSG_TYPE_STRUCT.unpack(self.__receive_all(MESSAGE_HEADER_SIZE))
 
         # Dispatch based on message type
-        if msg_type == MSG_TYPE_REGISTER_BETS:
-            bets: List[StandardBet] = self.__decode_bets()
-            return MsgRegisterBets(bets)
-        elif msg_type == MSG_TYPE_ACK:
-            return MsgAck()
-        elif msg_type == MSG_TYPE_ALL_BETS_SENT:
-            return MsgAllBetsSent()
-        elif msg_type == MSG_TYPE_REQUEST_WINNERS:
-            return MsgRequestWinners()
-
-        # Unknown message type
-        raise ValueError(f"Unknown msg_type {msg_type}")
+        decoder = Socket._MESSAGE_DECODERS.get(msg_type)
+        if decoder is None:
+            raise ValueError(f"Unknown msg_type {msg_type}")
+        return decoder(self)
 
     def get_socket(self) -> StdSocket:
         """
@@ -315,6 +416,11 @@ class Socket:
     def get_remote_address(self) -> str:
         """
         Return the remote address (ip:port) number of the connected peer.
+
+        The address is resolved with a single `getpeername` syscall on
+        first use and cached for the lifetime of the connection.
         """
-        addr = self._socket.getpeername()
-        return f"{addr[0]}:{addr[1]}"
+        if self._remote_address is None:
+            addr = self._socket.getpeername()
+            self._remote_address = f"{addr[0]}:{addr[1]}"
+        return self._remote_address
@@ -1,6 +1,7 @@
 import csv
 import datetime
 import time
+from typing import Iterator
 
 
 """ Bets storage location. """
@@ -40,10 +41,26 @@ def store_bets(bets: list[Bet]) -> None:
                              bet.document, bet.birthdate, bet.number])
 
 """
-Loads the information all the bets in the STORAGE_FILEPATH file.
+Persist preformatted CSV rows of bets in the STORAGE_FILEPATH file
+with a single write call. `payload` must be newline-terminated rows in
+the same column layout produced by store_bets.
+Returns the number of characters written, or -1 if storing failed, so
+callers can branch on the result without exception handling.
 Not thread-safe/process-safe.
 """
-def load_bets() -> list[Bet]:
+def store_bets_raw(payload: str) -> int:
+    try:
+        with open(STORAGE_FILEPATH, 'a+') as file:
+            return file.write(payload)
+    except OSError:
+        return -1
+
+"""
+Streams the information of all the bets in the STORAGE_FILEPATH file,
+one parsed bet at a time, so memory use does not grow with the file.
+Not thread-safe/process-safe.
+"""
+def load_bets() -> Iterator[Bet]:
     with open(STORAGE_FILEPATH, 'r') as file:
         reader = csv.reader(file, quoting=csv.QUOTE_MINIMAL)
         for row in reader:
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 
 from configparser import ConfigParser
+from functools import lru_cache
 from common.server import Server
 from common.logger import LoggerHandler
 from common.signal_handler import SignalHandler
@@ -15,6 +16,22 @@ LOG_DATETIME_FORMAT: str = "%Y-%m-%d %H:%M:%S"
 CONFIG_FILEPATH: str = "config.ini"
 
 
+def get_config_value(config: ConfigParser, key: str) -> str:
+    """
+    Resolve a config value, preferring the environment over config.ini.
+
+    Raises
+    ------
+    KeyError
+        If the key is missing from both the environment and the file.
+    """
+    value = os.environ.get(key)
+    if value is not None:
+        return value
+    return config["DEFAULT"][key]
+
+
+@lru_cache(maxsize=1)
 def initialize_config() -> dict:
     """
     Parse environment variables or config file to find program config params.
@@ -42,28 +59,25 @@ def initialize_config() -> dict:
         Dictionary with parsed configuration parameters.
     """
 
-    config = ConfigParser(os.environ)
+    # A plain ConfigParser: seeding it with os.environ would copy the
+    # whole environment into the DEFAULT section, and the env-first
+    # lookup is done lazily in get_config_value instead
+    config = ConfigParser()
     # If config.ini does not exist, config object remains unchanged
     config.read(CONFIG_FILEPATH)
 
     config_params = {}
     try:
         # Port where the server will listen
-        config_params["port"] = int(
-            os.getenv("SERVER_PORT", config["DEFAULT"]["SERVER_PORT"])
-        )
+        config_params["port"] = int(get_config_value(config, "SERVER_PORT"))
 
         # Maximum number of queued connections
         config_params["listen_backlog"] = int(
-            os.getenv(
-                "SERVER_LISTEN_BACKLOG", config["DEFAULT"]["SERVER_LISTEN_BACKLOG"]
-            )
+            get_config_value(config, "SERVER_LISTEN_BACKLOG")
         )
 
         # Logging level (DEBUG, INFO, ERROR, etc.)
-        config_params["logging_level"] = os.getenv(
-            "LOGGING_LEVEL", config["DEFAULT"]["LOGGING_LEVEL"]
-        )
+        config_params["logging_level"] = get_config_value(config, "LOGGING_LEVEL")
 
         # Number of agencies (defaults to listen_backlog if not explicitly set)
         config_params["number_of_agencies"] = int(
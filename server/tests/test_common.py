@@ -1,5 +1,11 @@
 from common.utils import *
+from common.messages import StandardBet
+from common.socket import Socket
 import os
+import socket
+import struct
+import threading
+import time
 import unittest
 
 class TestUtils(unittest.TestCase):
@@ -46,6 +52,59 @@ class TestUtils(unittest.TestCase):
         self._assert_equal_bets(to_store[0], from_load[0])
         self._assert_equal_bets(to_store[1], from_load[1])
 
+    def test_store_bets_raw_rows_load_as_bets(self):
+        written = store_bets_raw("1,first,last,10000000,2000-12-20,7500\n")
+        self.assertGreaterEqual(written, 0)
+        from_load = list(load_bets())
+
+        self.assertEqual(1, len(from_load))
+        expected = Bet('1', 'first', 'last', '10000000', '2000-12-20', 7500)
+        self._assert_equal_bets(expected, from_load[0])
+
+    def test_to_csv_row_escapes_free_text_fields(self):
+        bet = StandardBet(1, 'first, "middle"', 'last\nname', 30000001, 976579200, 7500)
+        written = store_bets_raw(bet.to_csv_row() + "\n")
+        self.assertGreaterEqual(written, 0)
+        from_load = list(load_bets())
+
+        self.assertEqual(1, len(from_load))
+        self.assertEqual('first, "middle"', from_load[0].first_name)
+        self.assertEqual('last\nname', from_load[0].last_name)
+        self.assertEqual('30000001', from_load[0].document)
+
+    def test_receive_message_with_payload_above_read_ahead_size(self):
+        # Regression test: payloads of READ_AHEAD_SIZE or more take the
+        # direct large-read path in Socket.__receive_all, which must pass
+        # MSG_WAITALL as recv_into's flags argument (not its byte count)
+        name = 'a' * 9000
+        name_bytes = name.encode()
+        surname_bytes = 'last'.encode()
+        payload = struct.pack('>II', 1, len(name_bytes)) + name_bytes
+        payload += struct.pack('>I', len(surname_bytes)) + surname_bytes
+        payload += struct.pack('>IqI', 10000000, 976579200, 7500)
+        receiver_raw, sender = socket.socketpair()
+        try:
+            # Send only the framing up front and deliver the payload
+            # slightly later, so the read-ahead buffer is drained when the
+            # payload read starts and the direct large-read path runs
+            sender.sendall(struct.pack('>HIQ', 1, 1, len(payload)))
+            delayed_send = threading.Thread(
+                target=lambda: (time.sleep(0.2), sender.sendall(payload))
+            )
+            delayed_send.start()
+
+            receiver = Socket._Socket__from_existing(receiver_raw)
+            msg = receiver.receive_message()
+            delayed_send.join()
+
+            bets = [bet.to_utility_bet() for bet in msg.get_bets()]
+            self.assertEqual(1, len(bets))
+            self.assertEqual(name, bets[0].first_name)
+            self.assertEqual('last', bets[0].last_name)
+        finally:
+            receiver_raw.close()
+            sender.close()
+
     def _assert_equal_bets(self, b1, b2):
         self.assertEqual(b1.agency, b2.agency)
         self.assertEqual(b1.first_name, b2.first_name)